@@ -1,3 +1,4 @@
+from typing import Dict
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
@@ -12,6 +13,34 @@ class Settings(BaseSettings):
     openai_api_key: str
     db_uri: str
     vector_collection_name: str
+    embedding_backend: str = "openai"  # "openai" or "local"
+    openai_embedding_model: str = "text-embedding-ada-002"
+    local_embedding_model_dir: str = "app/models/bge-small-en-v1.5"
+    embedding_batch_size: int = 128
+    embedding_max_concurrency: int = 4
+    embedding_max_retries: int = 3
+    query_embedding_cache_size: int = 1024
+    parent_chunk_tokens: int = 1024
+    child_chunk_tokens: int = 256
+    child_chunk_overlap: int = 32
+    parent_expand_min_children: int = 2
+    thread_lock_backend: str = "local"  # "local" or "postgres" for multiple workers
+    web_search_cache_ttl_seconds: int = 86400
+    web_search_news_ttl_seconds: int = 3600
+    web_search_stale_seconds: int = 86400
+    web_search_cache_max_bytes: int = 50_000_000
+    web_search_memory_cache_size: int = 256
+    web_search_touch_interval_seconds: int = 60
+    web_search_trim_interval_seconds: int = 60
+    llm_deadline_seconds: float = 30.0
+    llm_hedge_delay_seconds: float = 4.0  # used until enough latencies are observed to estimate p95
+    llm_hedging_enabled: bool = True
+    llm_max_retries: int = 2
+    # Fallback per primary model; only list fallbacks that are cheaper or faster.
+    llm_fallback_models: Dict[str, str] = {"gpt-4.1-mini-2025-04-14": "gpt-4.1-nano-2025-04-14"}
+    # Worker threads for LLM attempts: 40 request threads x 2 parallel agents x 2 with hedges.
+    llm_max_concurrency: int = 160
+    supervisor_mode: str = "sequential"  # "sequential" or "parallel"
 
     class Config:
         # Adjust the path below if your .env is not at the project root.
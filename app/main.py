@@ -1,5 +1,6 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from prometheus_client import make_asgi_app
 from app.routers import customer, documents
 
 app = FastAPI()
@@ -14,6 +15,7 @@ app.add_middleware(
 
 app.include_router(customer.router)
 app.include_router(documents.router)
+app.mount("/metrics", make_asgi_app())
 
 if __name__ == "__main__":
     import uvicorn
@@ -16,7 +16,7 @@ def upload_pdf(file: UploadFile = File(...)):
 
     try:
         markdown_content = process_document(temp_filename)
-        headers_to_split_on = [("##", "Header 1")]
+        headers_to_split_on = [("#", "Header 1"), ("##", "Header 2"), ("###", "Header 3")]
         add_document_to_vector_store(markdown_content, headers_to_split_on)
     finally:
         os.remove(temp_filename)
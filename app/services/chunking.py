@@ -0,0 +1,74 @@
+import uuid
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+from langchain.docstore.document import Document
+from langchain_text_splitters import MarkdownHeaderTextSplitter, RecursiveCharacterTextSplitter
+
+PARENT_ID_KEY = "parent_id"
+
+def _token_splitter(chunk_tokens: int, overlap_tokens: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter.from_tiktoken_encoder(
+        encoding_name="cl100k_base",
+        chunk_size=chunk_tokens,
+        chunk_overlap=overlap_tokens,
+    )
+
+def split_markdown(
+    markdown_content: str,
+    headers_to_split_on: Sequence[Tuple[str, str]],
+    parent_chunk_tokens: int = 1024,
+    child_chunk_tokens: int = 256,
+    child_chunk_overlap: int = 32,
+) -> Tuple[List[Document], List[Document]]:
+    """
+    Splits markdown into header sections bounded to parent_chunk_tokens (parents)
+    and small overlapping chunks of each parent (children). Every child carries
+    the id of its parent in metadata so the section can be fetched later.
+
+    Returns:
+        tuple[list[Document], list[Document]]: The parent and child documents.
+    """
+    header_splitter = MarkdownHeaderTextSplitter(list(headers_to_split_on), strip_headers=False)
+    parent_splitter = _token_splitter(parent_chunk_tokens, 0)
+    child_splitter = _token_splitter(child_chunk_tokens, child_chunk_overlap)
+
+    sections = header_splitter.split_text(markdown_content)
+    parents = parent_splitter.split_documents(sections)
+    children = []
+    for parent in parents:
+        parent.id = str(uuid.uuid4())
+        for child in child_splitter.split_documents([parent]):
+            child.metadata[PARENT_ID_KEY] = parent.id
+            children.append(child)
+    return parents, children
+
+def expand_to_parents(
+    documents: Iterable[Document],
+    get_parents: Callable[[List[str]], Dict[str, Document]],
+    min_children: int = 2,
+) -> List[Document]:
+    """
+    Replaces retrieved children with their parent section when at least
+    min_children of them come from the same parent, keeping the rank of the
+    best child. Other children (and documents without a parent) pass through.
+    """
+    documents = list(documents)
+    counts: Dict[str, int] = {}
+    for doc in documents:
+        parent_id = doc.metadata.get(PARENT_ID_KEY)
+        if parent_id:
+            counts[parent_id] = counts.get(parent_id, 0) + 1
+
+    wanted = [parent_id for parent_id, count in counts.items() if count >= min_children]
+    parents = get_parents(wanted) if wanted else {}
+
+    expanded = []
+    emitted = set()
+    for doc in documents:
+        parent_id = doc.metadata.get(PARENT_ID_KEY)
+        if parent_id in parents:
+            if parent_id not in emitted:
+                expanded.append(parents[parent_id])
+                emitted.add(parent_id)
+        else:
+            expanded.append(doc)
+    return expanded
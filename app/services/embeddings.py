@@ -0,0 +1,104 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+from langchain_core.embeddings import Embeddings
+from tenacity import retry, retry_if_exception, stop_after_attempt, wait_random_exponential
+from app.config import settings
+from app.logging_config import logger
+from app.utils.errors import is_transient_error
+from app.utils.lru_cache import LRUCache
+
+class BatchedEmbeddings(Embeddings):
+    """
+    Wraps an embedding model so documents are embedded in fixed-size batches
+    with a bounded number of requests in flight, and query embeddings are
+    served from a per-process LRU cache.
+    """
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 128,
+        max_concurrency: int = 4,
+        max_retries: int = 3,
+        query_cache_size: int = 1024,
+    ):
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.max_retries = max(0, max_retries)
+        self.query_cache = LRUCache(query_cache_size)
+
+    def _with_retry(self, fn):
+        return retry(
+            # 4xx errors such as an over-long input or a bad key fail the same way again.
+            retry=retry_if_exception(is_transient_error),
+            stop=stop_after_attempt(self.max_retries + 1),
+            wait=wait_random_exponential(multiplier=0.5, max=10),
+            reraise=True,
+        )(fn)
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        return self._with_retry(self.embeddings.embed_documents)(batch)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) <= 1 or self.max_concurrency == 1:
+            results = [self._embed_batch(batch) for batch in batches]
+        else:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                # map() preserves input order, so vectors line up with texts.
+                results = list(executor.map(self._embed_batch, batches))
+        logger.info(f"Embedded {len(texts)} texts in {len(batches)} batches.")
+        return [vector for batch in results for vector in batch]
+
+    def embed_query(self, text: str) -> List[float]:
+        cached = self.query_cache.get(text)
+        if cached is not None:
+            return cached
+        vector = self._with_retry(self.embeddings.embed_query)(text)
+        self.query_cache.set(text, vector)
+        return vector
+
+def _build_base_embeddings() -> Embeddings:
+    backend = settings.embedding_backend.lower()
+    if backend == "local":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(
+            model_name=settings.local_embedding_model_dir,
+            model_kwargs={"device": "cpu"},
+            encode_kwargs={"normalize_embeddings": True, "batch_size": settings.embedding_batch_size},
+        )
+    if backend == "openai":
+        from langchain_openai import OpenAIEmbeddings
+        return OpenAIEmbeddings(
+            model=settings.openai_embedding_model,
+            api_key=settings.openai_api_key,
+            chunk_size=settings.embedding_batch_size,
+            # Retries are handled per batch and per query by BatchedEmbeddings.
+            max_retries=0,
+        )
+    raise ValueError(f"Unsupported embedding backend: {settings.embedding_backend}")
+
+_embeddings: Optional[BatchedEmbeddings] = None
+_embeddings_lock = threading.Lock()
+
+def get_embeddings() -> BatchedEmbeddings:
+    """
+    Returns the process-wide embedding model so every vector store shares the
+    same query embedding cache.
+    """
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            backend = settings.embedding_backend.lower()
+            _embeddings = BatchedEmbeddings(
+                _build_base_embeddings(),
+                batch_size=settings.embedding_batch_size,
+                # A local CPU model already uses every core per batch.
+                max_concurrency=1 if backend == "local" else settings.embedding_max_concurrency,
+                max_retries=settings.embedding_max_retries,
+                query_cache_size=settings.query_embedding_cache_size,
+            )
+            logger.info(f"Embedding backend '{backend}' initialized.")
+        return _embeddings
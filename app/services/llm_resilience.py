@@ -0,0 +1,226 @@
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, CancelledError, ThreadPoolExecutor, wait
+from typing import Any, List, Optional
+from langchain.chat_models import init_chat_model
+from langchain_core.callbacks import CallbackManagerForLLMRun
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field
+from prometheus_client import Counter, Histogram
+from app.config import settings
+from app.logging_config import logger
+from app.utils.errors import is_transient_error
+
+# Buckets reach past LLM_DEADLINE_SECONDS so the slow tail stays visible.
+LLM_CALL_SECONDS = Histogram(
+    "llm_call_seconds", "Latency of successful LLM attempts.", ["model"],
+    buckets=(0.5, 1, 2, 4, 8, 15, 30, 60),
+)
+LLM_HEDGES_FIRED = Counter("llm_hedges_fired_total", "Hedged duplicate LLM requests sent.", ["model"])
+LLM_HEDGES_WON = Counter("llm_hedges_won_total", "Hedged LLM requests that returned first.", ["model"])
+LLM_RETRIES = Counter("llm_retries_total", "LLM attempts retried after a failure or deadline.", ["model"])
+LLM_DEADLINES_EXCEEDED = Counter("llm_deadlines_exceeded_total", "LLM attempts that missed their deadline.", ["model"])
+LLM_FALLBACKS = Counter("llm_fallbacks_total", "LLM calls answered by a fallback model.", ["model"])
+
+# Shared by every model; sized by LLM_MAX_CONCURRENCY so attempts and their
+# hedges start immediately instead of queueing behind other turns.
+_executor = ThreadPoolExecutor(max_workers=settings.llm_max_concurrency, thread_name_prefix="llm-call")
+
+class LatencyTracker:
+    """
+    Keeps a rolling window of call latencies to estimate the p95 used as the
+    hedge delay.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def p95(self, default: float) -> float:
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return default
+            ordered = sorted(self._samples)
+        return ordered[int(0.95 * (len(ordered) - 1))]
+
+class ResilientChatModel(BaseChatModel):
+    """
+    Chat model wrapper that bounds each attempt with a deadline, sends a hedged
+    duplicate request when the first has not answered after the observed p95
+    latency, retries transient errors with jittered backoff and finally falls
+    back to the fallback models in order.
+    """
+
+    primary: Runnable
+    fallbacks: List[Runnable] = []
+    label: str = "chat_model"
+    deadline_seconds: float = 30.0
+    hedge_delay_seconds: float = 4.0
+    hedging_enabled: bool = True
+    max_retries: int = 2
+    latency: LatencyTracker = Field(default_factory=LatencyTracker)
+
+    @property
+    def _llm_type(self) -> str:
+        return "resilient-chat-model"
+
+    def bind_tools(self, tools, *, tool_choice=None, parallel_tool_calls=None, **kwargs):
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        # A RunnableBinding lets create_react_agent see the tools as already
+        # bound, so options such as parallel_tool_calls=False are kept.
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    @staticmethod
+    def _bind_call_tools(model: Runnable, kwargs: dict):
+        """
+        Binds the tools passed with a call through the model's own bind_tools,
+        which translates options like tool_choice for its provider.
+        """
+        if "tools" not in kwargs:
+            return model, kwargs
+        call_kwargs = dict(kwargs)
+        tools = call_kwargs.pop("tools")
+        tool_kwargs = {key: call_kwargs.pop(key) for key in ("tool_choice", "parallel_tool_calls") if key in call_kwargs}
+        return model.bind_tools(tools, **tool_kwargs), call_kwargs
+
+    def _submit(self, model: Runnable, settled: threading.Event, messages: List[BaseMessage], config: dict,
+                stop: Optional[List[str]], **kwargs: Any):
+        """
+        Queues one attempt on the shared pool. The returned event is set once
+        the attempt starts running. An attempt that only starts after another
+        one has answered (settled) skips the request and raises CancelledError.
+        """
+        started = threading.Event()
+        context = contextvars.copy_context()
+
+        def run():
+            if settled.is_set():
+                raise CancelledError()
+            started.set()
+            result = model.invoke(messages, config, stop=stop, **kwargs)
+            # Set in the worker, before it can pick up a queued sibling attempt.
+            settled.set()
+            return result
+
+        return _executor.submit(context.run, run), started
+
+    def _hedged_call(self, model: Runnable, label: str, is_primary: bool, messages: List[BaseMessage],
+                     config: dict, stop: Optional[List[str]], **kwargs: Any) -> BaseMessage:
+        settled = threading.Event()
+        original, started = self._submit(model, settled, messages, config, stop, **kwargs)
+        # The deadline and hedge delay count from when the attempt starts
+        # running, not from when it was queued.
+        started.wait()
+        start = time.monotonic()
+        deadline = start + self.deadline_seconds
+        hedge_delay = self.latency.p95(self.hedge_delay_seconds) if is_primary else self.hedge_delay_seconds
+        hedge_at = start + hedge_delay
+
+        pending = {original}
+        hedge = None
+        errors = []
+        try:
+            while pending:
+                now = time.monotonic()
+                if now >= deadline:
+                    break
+                wake_at = min(deadline, hedge_at) if self.hedging_enabled and hedge is None else deadline
+                done, pending = wait(pending, timeout=max(0.0, wake_at - now), return_when=FIRST_COMPLETED)
+                for future in done:
+                    error = future.exception()
+                    if isinstance(error, CancelledError):
+                        continue
+                    if error is None:
+                        elapsed = time.monotonic() - start
+                        if is_primary:
+                            self.latency.record(elapsed)
+                        LLM_CALL_SECONDS.labels(label).observe(elapsed)
+                        if future is hedge:
+                            LLM_HEDGES_WON.labels(label).inc()
+                        return future.result()
+                    if not is_transient_error(error):
+                        raise error
+                    errors.append(error)
+                if self.hedging_enabled and hedge is None and pending and time.monotonic() >= hedge_at:
+                    hedge, _ = self._submit(model, settled, messages, config, stop, **kwargs)
+                    pending.add(hedge)
+                    LLM_HEDGES_FIRED.labels(label).inc()
+        finally:
+            # Drops attempts still queued; running ones end at the client timeout.
+            settled.set()
+            for future in pending:
+                future.cancel()
+
+        if not pending and errors:
+            raise errors[0]
+        LLM_DEADLINES_EXCEEDED.labels(label).inc()
+        raise TimeoutError(f"{label} did not respond within {self.deadline_seconds}s")
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Tracing context travels with the copied contextvars of each attempt.
+        config = {}
+        primary, call_kwargs = self._bind_call_tools(self.primary, kwargs)
+        fallbacks = [self._bind_call_tools(model, kwargs)[0] for model in self.fallbacks]
+        attempts = [(primary, self.label)] * (self.max_retries + 1)
+        attempts += [(model, f"{self.label}:fallback{i}") for i, model in enumerate(fallbacks)]
+        last_error = None
+        for attempt, (model, label) in enumerate(attempts):
+            if attempt:
+                if model is primary:
+                    LLM_RETRIES.labels(self.label).inc()
+                    # Full jitter keeps retries from concurrent turns apart.
+                    time.sleep(random.uniform(0, min(4.0, 0.25 * 2 ** attempt)))
+                logger.warning(f"Retrying with {label} after error: {last_error}")
+            try:
+                message = self._hedged_call(model, label, model is primary, messages, config, stop, **call_kwargs)
+            except Exception as e:
+                if not is_transient_error(e):
+                    raise
+                last_error = e
+                continue
+            if model is not primary:
+                LLM_FALLBACKS.labels(self.label).inc()
+            return ChatResult(generations=[ChatGeneration(message=message)])
+        raise last_error
+
+def init_resilient_chat_model(model: str, temperature: float, label: str = None) -> ResilientChatModel:
+    """
+    Builds a ResilientChatModel around init_chat_model using the LLM resilience
+    settings. Retries are disabled on the underlying client so every attempt
+    goes through the wrapper.
+    """
+    client_kwargs = {"temperature": temperature, "timeout": settings.llm_deadline_seconds, "max_retries": 0}
+    fallbacks = []
+    fallback_model = settings.llm_fallback_models.get(model)
+    if fallback_model and fallback_model != model:
+        fallbacks.append(init_chat_model(fallback_model, **client_kwargs))
+    return ResilientChatModel(
+        primary=init_chat_model(model, **client_kwargs),
+        fallbacks=fallbacks,
+        label=label or model,
+        deadline_seconds=settings.llm_deadline_seconds,
+        hedge_delay_seconds=settings.llm_hedge_delay_seconds,
+        hedging_enabled=settings.llm_hedging_enabled,
+        max_retries=settings.llm_max_retries,
+    )
@@ -0,0 +1,102 @@
+from typing import List
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.pregel import Pregel
+from langgraph.types import Send
+from pydantic import BaseModel, Field
+from app.logging_config import logger
+
+PLANNER_PROMPT = (
+    "- You are a dispatcher for a supervisor that has access to multiple agents.\n"
+    "- Split the user's latest message into independent sub-tasks and assign each to exactly one agent.\n"
+    "- Use at most one sub-task per agent; put everything an agent must do in its task.\n"
+    "- Each task must be self-contained: include any dates, times, names or preferences the agent needs, taken from the history.\n"
+    "- If the latest message continues an earlier exchange with an agent (e.g. answers its question), give that agent a task.\n"
+    "- Return no sub-tasks if the message can be answered from the history alone (greetings, thanks, small talk).\n\n"
+    "Available agents:\n"
+    "{agents}"
+)
+
+MERGE_PROMPT = (
+    "- The latest messages named after agents are their results for the user's latest message.\n"
+    "- Combine them into ONE reply that addresses every part of the user's message, in the order it was asked.\n"
+    "- If an agent asked the user for more information, include that question in your reply.\n"
+)
+
+class SubTask(BaseModel):
+    agent: str = Field(description="Name of the agent that should handle this sub-task.")
+    task: str = Field(description="Self-contained instruction for the agent.")
+
+class DispatchPlan(BaseModel):
+    tasks: List[SubTask] = Field(default_factory=list, description="Independent sub-tasks, at most one per agent.")
+
+class ParallelSupervisorState(MessagesState):
+    tasks: List[dict]
+
+def create_parallel_supervisor(
+    model: BaseChatModel,
+    agents: List[Pregel],
+    prompt: str,
+    agent_descriptions: dict,
+) -> StateGraph:
+    """
+    Creates a supervisor graph that splits a turn into independent sub-tasks,
+    runs the agents for them concurrently and merges their answers in a single
+    final supervisor response.
+
+    Args:
+        model: Chat model used both to plan the sub-tasks and to write the reply.
+        agents: Compiled agent graphs; each must have a unique name.
+        prompt: System prompt for the final supervisor response.
+        agent_descriptions: Maps each agent name to what it can do.
+
+    Returns:
+        StateGraph: The uncompiled graph, like create_supervisor.
+    """
+    agents_by_name = {agent.name: agent for agent in agents}
+    planner = model.with_structured_output(DispatchPlan)
+    planner_prompt = PLANNER_PROMPT.format(
+        agents="\n".join(f"- {name}: {agent_descriptions[name]}" for name in agents_by_name)
+    )
+
+    def plan(state: ParallelSupervisorState):
+        result = planner.invoke([SystemMessage(content=planner_prompt)] + state["messages"])
+        tasks, seen = [], set()
+        for sub_task in result.tasks:
+            if sub_task.agent in agents_by_name and sub_task.agent not in seen:
+                seen.add(sub_task.agent)
+                tasks.append(sub_task.model_dump())
+        logger.info(f"Dispatching {len(tasks)} sub-task(s): {[task['agent'] for task in tasks]}")
+        return {"tasks": tasks}
+
+    def dispatch(state: ParallelSupervisorState):
+        if not state.get("tasks"):
+            return "supervisor"
+        return [
+            Send(task["agent"], {"messages": state["messages"], "task": task["task"]})
+            for task in state["tasks"]
+        ]
+
+    def make_agent_node(agent: Pregel):
+        def run_agent(payload: dict, config: RunnableConfig):
+            messages = payload["messages"] + [HumanMessage(content=f"Task from supervisor: {payload['task']}")]
+            result = agent.invoke({"messages": messages}, config)
+            return {"messages": [AIMessage(content=result["messages"][-1].content, name=agent.name)]}
+        return run_agent
+
+    def respond(state: ParallelSupervisorState):
+        response = model.invoke([SystemMessage(content=prompt + MERGE_PROMPT)] + state["messages"])
+        return {"messages": [AIMessage(content=response.content, name="supervisor")], "tasks": []}
+
+    builder = StateGraph(ParallelSupervisorState)
+    builder.add_node("planner", plan)
+    builder.add_node("supervisor", respond)
+    for name, agent in agents_by_name.items():
+        builder.add_node(name, make_agent_node(agent))
+        builder.add_edge(name, "supervisor")
+    builder.add_edge(START, "planner")
+    builder.add_conditional_edges("planner", dispatch, [*agents_by_name, "supervisor"])
+    builder.add_edge("supervisor", END)
+    return builder
@@ -0,0 +1,79 @@
+from typing import Dict, List
+import psycopg
+from psycopg.types.json import Jsonb
+from langchain.docstore.document import Document
+from langchain_core.callbacks import CallbackManagerForRetrieverRun
+from langchain_core.retrievers import BaseRetriever
+from app.logging_config import logger
+from app.services.chunking import expand_to_parents
+
+class ParentDocumentStore:
+    """
+    Stores the parent sections of indexed child chunks in PostgreSQL.
+    """
+
+    def __init__(self, db_uri: str, collection_name: str):
+        self.db_uri = db_uri
+        self.collection_name = collection_name
+
+    def setup(self):
+        with psycopg.connect(self.db_uri) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS document_parents (
+                        id TEXT PRIMARY KEY,
+                        collection_name TEXT NOT NULL,
+                        content TEXT NOT NULL,
+                        metadata JSONB,
+                        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                conn.commit()
+
+    def add_documents(self, documents: List[Document]):
+        with psycopg.connect(self.db_uri) as conn:
+            with conn.cursor() as cur:
+                cur.executemany("""
+                    INSERT INTO document_parents (id, collection_name, content, metadata)
+                    VALUES (%s, %s, %s, %s)
+                    ON CONFLICT (id) DO UPDATE
+                    SET content = EXCLUDED.content, metadata = EXCLUDED.metadata
+                """, [
+                    (doc.id, self.collection_name, doc.page_content, Jsonb(doc.metadata))
+                    for doc in documents
+                ])
+                conn.commit()
+        logger.info(f"Stored {len(documents)} parent sections.")
+
+    def get_documents(self, ids: List[str]) -> Dict[str, Document]:
+        if not ids:
+            return {}
+        try:
+            with psycopg.connect(self.db_uri) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        SELECT id, metadata, content FROM document_parents
+                        WHERE id = ANY(%s) AND collection_name = %s
+                    """, (list(ids), self.collection_name))
+                    rows = cur.fetchall()
+        except Exception as e:
+            # Fall back to the child chunks rather than failing the turn.
+            logger.error(f"Error fetching parent documents: {e}")
+            return {}
+        return {row[0]: Document(id=row[0], metadata=row[1] or {}, page_content=row[2]) for row in rows}
+
+class ParentExpandingRetriever(BaseRetriever):
+    """
+    Retrieves (and reranks) small child chunks, then swaps in the parent section
+    only where several of the returned chunks belong to it.
+    """
+
+    base_retriever: BaseRetriever
+    parent_store: ParentDocumentStore
+    min_children: int = 2
+
+    def _get_relevant_documents(
+        self, query: str, *, run_manager: CallbackManagerForRetrieverRun
+    ) -> List[Document]:
+        children = self.base_retriever.invoke(query, config={"callbacks": run_manager.get_child()})
+        return expand_to_parents(children, self.parent_store.get_documents, self.min_children)
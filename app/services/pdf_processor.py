@@ -1,13 +1,14 @@
 from docling.datamodel.base_models import InputFormat  
 from docling.datamodel.pipeline_options import PdfPipelineOptions, TesseractCliOcrOptions
 from docling.document_converter import DocumentConverter, PdfFormatOption
-from langchain_text_splitters import MarkdownHeaderTextSplitter
 from langchain.prompts import ChatPromptTemplate
 from langchain.schema import StrOutputParser
 from langchain_openai import ChatOpenAI
-from langchain_openai import OpenAIEmbeddings
 from langchain_postgres import PGVector
 from app.config import settings
+from app.services.chunking import split_markdown
+from app.services.embeddings import get_embeddings
+from app.services.parent_store import ParentDocumentStore
 
 # Update your DB connection string as needed.
 def process_document(file_path: str) -> str:
@@ -64,13 +65,21 @@ def generate_chunk_context(document, chunk):
     return context
 
 def add_document_to_vector_store(markdown_content: str, headers_to_split_on):
-    markdown_splitter = MarkdownHeaderTextSplitter(headers_to_split_on)
-    md_header_splits = markdown_splitter.split_text(markdown_content)
+    parents, children = split_markdown(
+        markdown_content,
+        headers_to_split_on,
+        parent_chunk_tokens=settings.parent_chunk_tokens,
+        child_chunk_tokens=settings.child_chunk_tokens,
+        child_chunk_overlap=settings.child_chunk_overlap,
+    )
     collection_name = settings.vector_collection_name
+    parent_store = ParentDocumentStore(settings.db_uri, collection_name)
+    parent_store.setup()
+    parent_store.add_documents(parents)
     vector_store = PGVector(
-        embeddings=OpenAIEmbeddings(),
+        embeddings=get_embeddings(),
         collection_name=collection_name,
         connection=settings.db_uri,
         use_jsonb=True,
     )
-    vector_store.add_documents(md_header_splits)
\ No newline at end of file
+    vector_store.add_documents(children)
\ No newline at end of file
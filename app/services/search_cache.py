@@ -0,0 +1,298 @@
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from typing import Any, Callable, Dict, List, Literal, Optional
+import psycopg
+from psycopg.types.json import Jsonb
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_tavily import TavilySearch
+from app.logging_config import logger
+from app.utils.lru_cache import LRUCache
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split())
+
+class WebSearchCache:
+    """
+    A two-level TTL cache for web search results: an in-process LRU in front of
+    a PostgreSQL table bounded by total result size.
+
+    Expired entries are still served for up to stale_seconds while a single
+    background refresh replaces them.
+    """
+
+    def __init__(
+        self,
+        db_uri: str,
+        ttl_seconds: int = 86400,
+        news_ttl_seconds: int = 3600,
+        stale_seconds: int = 86400,
+        max_bytes: int = 50_000_000,
+        memory_size: int = 256,
+        touch_interval_seconds: int = 60,
+        trim_interval_seconds: int = 60,
+    ):
+        self.db_uri = db_uri
+        self.ttl_seconds = ttl_seconds
+        self.news_ttl_seconds = news_ttl_seconds
+        self.stale_seconds = stale_seconds
+        self.max_bytes = max_bytes
+        self.memory = LRUCache(memory_size)
+        self.touch_interval_seconds = touch_interval_seconds
+        self._pending_touches = set()
+        self._last_touch_flush = time.monotonic()
+        self._touch_lock = threading.Lock()
+        self.trim_interval_seconds = trim_interval_seconds
+        self._last_trim = float("-inf")
+        self._trim_lock = threading.Lock()
+        self._refreshing = set()
+        self._refreshing_lock = threading.Lock()
+
+    def setup(self):
+        with psycopg.connect(self.db_uri) as conn:
+            with conn.cursor() as cur:
+                cur.execute("""
+                    CREATE TABLE IF NOT EXISTS web_search_cache (
+                        key TEXT PRIMARY KEY,
+                        query TEXT NOT NULL,
+                        params JSONB,
+                        result JSONB NOT NULL,
+                        size_bytes INTEGER NOT NULL,
+                        created_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP,
+                        expires_at TIMESTAMPTZ NOT NULL,
+                        last_accessed_at TIMESTAMPTZ DEFAULT CURRENT_TIMESTAMP
+                    )
+                """)
+                cur.execute("""
+                    CREATE INDEX IF NOT EXISTS web_search_cache_last_accessed_idx
+                    ON web_search_cache (last_accessed_at)
+                """)
+                conn.commit()
+
+    @staticmethod
+    def make_key(query: str, params: Dict[str, Any]) -> str:
+        payload = json.dumps({"query": normalize_query(query), "params": params}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def ttl_for(self, params: Dict[str, Any]) -> int:
+        # Time-sensitive searches go stale much faster than general ones.
+        if params.get("topic") in ("news", "finance") or params.get("time_range") == "day":
+            return self.news_ttl_seconds
+        return self.ttl_seconds
+
+    def _load(self, key: str) -> Optional[tuple]:
+        try:
+            with psycopg.connect(self.db_uri) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE web_search_cache SET last_accessed_at = CURRENT_TIMESTAMP
+                        WHERE key = %s
+                        RETURNING result, EXTRACT(EPOCH FROM expires_at)
+                    """, (key,))
+                    row = cur.fetchone()
+                    conn.commit()
+        except Exception as e:
+            logger.error(f"Error reading web search cache: {e}")
+            return None
+        if row is None:
+            return None
+        entry = (row[0], float(row[1]))
+        self.memory.set(key, entry)
+        return entry
+
+    def _flush_touches(self, keys: List[str]):
+        try:
+            with psycopg.connect(self.db_uri) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        UPDATE web_search_cache SET last_accessed_at = CURRENT_TIMESTAMP
+                        WHERE key = ANY(%s)
+                    """, (keys,))
+                    conn.commit()
+        except Exception as e:
+            logger.error(f"Error updating web search cache access times: {e}")
+
+    def _touch(self, key: str):
+        # Memory hits never reach PostgreSQL, so record them in batches at most
+        # once per touch interval to keep hot entries safe from size eviction.
+        with self._touch_lock:
+            self._pending_touches.add(key)
+            now = time.monotonic()
+            if now - self._last_touch_flush < self.touch_interval_seconds:
+                return
+            keys = list(self._pending_touches)
+            self._pending_touches.clear()
+            self._last_touch_flush = now
+        threading.Thread(target=self._flush_touches, args=(keys,), daemon=True).start()
+
+    def _store(self, key: str, query: str, params: Dict[str, Any], result: Dict[str, Any]):
+        expires_at = time.time() + self.ttl_for(params)
+        self.memory.set(key, (result, expires_at))
+        payload = json.dumps(result, default=str)
+        try:
+            with psycopg.connect(self.db_uri) as conn:
+                with conn.cursor() as cur:
+                    cur.execute("""
+                        INSERT INTO web_search_cache (key, query, params, result, size_bytes, expires_at)
+                        VALUES (%s, %s, %s, %s::jsonb, %s, TO_TIMESTAMP(%s))
+                        ON CONFLICT (key) DO UPDATE
+                        SET result = EXCLUDED.result, size_bytes = EXCLUDED.size_bytes,
+                            created_at = CURRENT_TIMESTAMP, expires_at = EXCLUDED.expires_at,
+                            last_accessed_at = CURRENT_TIMESTAMP
+                    """, (key, normalize_query(query), Jsonb(params), payload, len(payload.encode("utf-8")), expires_at))
+                    conn.commit()
+        except Exception as e:
+            logger.error(f"Error writing web search cache: {e}")
+        self._schedule_trim()
+
+    def _trim(self):
+        try:
+            with psycopg.connect(self.db_uri) as conn:
+                with conn.cursor() as cur:
+                    # Drop entries past their stale window, then the least recently
+                    # used ones until the table fits in max_bytes.
+                    cur.execute("""
+                        DELETE FROM web_search_cache
+                        WHERE expires_at < CURRENT_TIMESTAMP - make_interval(secs => %s)
+                    """, (self.stale_seconds,))
+                    cur.execute("""
+                        DELETE FROM web_search_cache WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size_bytes) OVER (
+                                    ORDER BY last_accessed_at DESC, key
+                                ) AS running_bytes
+                                FROM web_search_cache
+                            ) ranked
+                            WHERE running_bytes > %s
+                        )
+                    """, (self.max_bytes,))
+                    conn.commit()
+        except Exception as e:
+            logger.error(f"Error trimming web search cache: {e}")
+
+    def _schedule_trim(self):
+        # The trim scans the whole table, so keep it off the request path and
+        # run it at most once per trim interval.
+        with self._trim_lock:
+            now = time.monotonic()
+            if now - self._last_trim < self.trim_interval_seconds:
+                return
+            self._last_trim = now
+        threading.Thread(target=self._trim, daemon=True).start()
+
+    def _refresh(self, key: str, query: str, params: Dict[str, Any], fetch: Callable[[], Dict[str, Any]]):
+        try:
+            result = fetch()
+            if "error" not in result:
+                self._store(key, query, params, result)
+                logger.info(f"Refreshed stale web search cache entry for '{normalize_query(query)}'.")
+        except Exception as e:
+            logger.error(f"Background web search refresh failed: {e}")
+        finally:
+            with self._refreshing_lock:
+                self._refreshing.discard(key)
+
+    def _schedule_refresh(self, key: str, query: str, params: Dict[str, Any], fetch: Callable[[], Dict[str, Any]]):
+        with self._refreshing_lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+        threading.Thread(target=self._refresh, args=(key, query, params, fetch), daemon=True).start()
+
+    def get_or_fetch(self, query: str, params: Dict[str, Any], fetch: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Returns the cached result for query and params, calling fetch only on a
+        miss. Results carrying an "error" key are returned but never cached.
+        """
+        key = self.make_key(query, params)
+        entry = self.memory.get(key)
+        if entry is not None:
+            self._touch(key)
+        else:
+            entry = self._load(key)
+        now = time.time()
+        if entry is not None:
+            result, expires_at = entry
+            if now < expires_at:
+                logger.info(f"Web search cache hit for '{normalize_query(query)}'.")
+                return result
+            if now < expires_at + self.stale_seconds:
+                logger.info(f"Serving stale web search result for '{normalize_query(query)}'.")
+                self._schedule_refresh(key, query, params, fetch)
+                return result
+
+        result = fetch()
+        if "error" not in result:
+            self._store(key, query, params, result)
+        return result
+
+class CachedTavilySearch(TavilySearch):
+    """
+    TavilySearch that answers repeated searches from a WebSearchCache instead
+    of calling the Tavily API.
+    """
+
+    cache: WebSearchCache
+
+    def _effective_params(self, include_domains, exclude_domains, search_depth,
+                          include_images, time_range, topic) -> Dict[str, Any]:
+        return {
+            "include_domains": sorted(include_domains or self.include_domains or []),
+            "exclude_domains": sorted(exclude_domains or self.exclude_domains or []),
+            "search_depth": search_depth or self.search_depth,
+            "include_images": include_images or self.include_images,
+            "time_range": time_range or self.time_range,
+            "topic": topic or self.topic,
+            "country": self.country,
+            "max_results": self.max_results,
+            "include_answer": self.include_answer,
+            "include_raw_content": self.include_raw_content,
+            "include_image_descriptions": self.include_image_descriptions,
+        }
+
+    def _run(
+        self,
+        query: str,
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        search_depth: Optional[Literal["basic", "advanced"]] = "basic",
+        include_images: Optional[bool] = False,
+        time_range: Optional[Literal["day", "week", "month", "year"]] = None,
+        topic: Optional[Literal["general", "news", "finance"]] = "general",
+        run_manager: Optional[CallbackManagerForToolRun] = None,
+    ) -> Dict[str, Any]:
+        params = self._effective_params(include_domains, exclude_domains, search_depth,
+                                        include_images, time_range, topic)
+
+        def fetch():
+            return super(CachedTavilySearch, self)._run(
+                query,
+                include_domains=include_domains,
+                exclude_domains=exclude_domains,
+                search_depth=search_depth,
+                include_images=include_images,
+                time_range=time_range,
+                topic=topic,
+            )
+
+        return self.cache.get_or_fetch(query, params, fetch)
+
+    async def _arun(
+        self,
+        query: str,
+        include_domains: Optional[List[str]] = None,
+        exclude_domains: Optional[List[str]] = None,
+        search_depth: Optional[Literal["basic", "advanced"]] = "basic",
+        include_images: Optional[bool] = False,
+        time_range: Optional[Literal["day", "week", "month", "year"]] = None,
+        topic: Optional[Literal["general", "news", "finance"]] = "general",
+        run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+    ) -> Dict[str, Any]:
+        # The cache talks to PostgreSQL synchronously, so run it off the event loop.
+        return await asyncio.get_running_loop().run_in_executor(
+            None,
+            lambda: self._run(query, include_domains, exclude_domains, search_depth,
+                              include_images, time_range, topic),
+        )
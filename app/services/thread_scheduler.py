@@ -0,0 +1,128 @@
+import threading
+from concurrent.futures import Future
+from contextlib import contextmanager
+from typing import Callable, Dict, Hashable, Tuple, TypeVar
+import psycopg
+from app.config import settings
+from app.logging_config import logger
+
+T = TypeVar("T")
+
+class _FifoLock:
+    """
+    A lock that is granted in the order it was requested.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._next_ticket = 0
+        self._now_serving = 0
+
+    def acquire(self):
+        with self._cond:
+            ticket = self._next_ticket
+            self._next_ticket += 1
+            while self._now_serving != ticket:
+                self._cond.wait()
+
+    def release(self):
+        with self._cond:
+            self._now_serving += 1
+            self._cond.notify_all()
+
+class ThreadScheduler:
+    """
+    Serializes conversation turns per thread_id and coalesces duplicate
+    submissions.
+
+    Turns for the same thread run one at a time in arrival order, while
+    different threads run in parallel. A submission identical to one that is
+    still queued or running for the same thread does not run again; it waits
+    for and returns the result of the original. With the "postgres" backend a
+    session advisory lock keyed on the thread_id also serializes turns across
+    worker processes.
+    """
+
+    def __init__(self, backend: str = "local", db_uri: str = None):
+        if backend not in ("local", "postgres"):
+            raise ValueError(f"Unsupported thread lock backend: {backend}")
+        self.backend = backend
+        self.db_uri = db_uri
+        self._lock = threading.Lock()
+        self._thread_locks: Dict[str, Tuple[_FifoLock, int]] = {}
+        self._inflight: Dict[Tuple[str, Hashable], Future] = {}
+
+    def _checkout(self, thread_id: str) -> _FifoLock:
+        with self._lock:
+            lock, users = self._thread_locks.get(thread_id, (None, 0))
+            if lock is None:
+                lock = _FifoLock()
+            self._thread_locks[thread_id] = (lock, users + 1)
+            return lock
+
+    def _checkin(self, thread_id: str):
+        with self._lock:
+            lock, users = self._thread_locks[thread_id]
+            if users <= 1:
+                del self._thread_locks[thread_id]
+            else:
+                self._thread_locks[thread_id] = (lock, users - 1)
+
+    @contextmanager
+    def _advisory_lock(self, thread_id: str):
+        if self.backend != "postgres":
+            yield
+            return
+        # Closing the connection releases the lock even if unlock never runs.
+        with psycopg.connect(self.db_uri, autocommit=True) as conn:
+            conn.execute("SELECT pg_advisory_lock(hashtextextended(%s, 0))", (thread_id,))
+            try:
+                yield
+            finally:
+                conn.execute("SELECT pg_advisory_unlock(hashtextextended(%s, 0))", (thread_id,))
+
+    @contextmanager
+    def serialize(self, thread_id: str):
+        """
+        Holds the per-thread lock for the duration of the block.
+        """
+        lock = self._checkout(thread_id)
+        lock.acquire()
+        try:
+            with self._advisory_lock(thread_id):
+                yield
+        finally:
+            lock.release()
+            self._checkin(thread_id)
+
+    def run(self, thread_id: str, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Runs fn for thread_id once every earlier turn of that thread has
+        finished, or joins an identical submission (same key) already in flight.
+        """
+        inflight_key = (thread_id, key)
+        with self._lock:
+            future = self._inflight.get(inflight_key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[inflight_key] = future
+
+        if not leader:
+            logger.info(f"Coalesced duplicate turn for thread {thread_id}.")
+            return future.result()
+
+        try:
+            with self.serialize(thread_id):
+                result = fn()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(inflight_key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._inflight.pop(inflight_key, None)
+        future.set_result(result)
+        return result
+
+thread_scheduler = ThreadScheduler(backend=settings.thread_lock_backend, db_uri=settings.db_uri)
@@ -1,12 +1,9 @@
 import os
 from datetime import datetime
-from langchain_openai import OpenAIEmbeddings
 from langchain_postgres import PGVector
-from langchain_tavily import TavilySearch
 from langchain.tools.retriever import create_retriever_tool
 from langgraph.prebuilt import create_react_agent
 from langgraph_supervisor import create_supervisor
-from langchain.chat_models import init_chat_model
 from langchain_community.retrievers import BM25Retriever
 from langchain.retrievers import EnsembleRetriever, ContextualCompressionRetriever
 from langchain_community.cross_encoders import HuggingFaceCrossEncoder
@@ -18,6 +15,11 @@ from psycopg import Connection
 import psycopg
 from app.config import settings
 from app.logging_config import logger
+from app.services.embeddings import get_embeddings
+from app.services.llm_resilience import init_resilient_chat_model
+from app.services.search_cache import CachedTavilySearch, WebSearchCache
+from app.services.parallel_supervisor import create_parallel_supervisor
+from app.services.parent_store import ParentDocumentStore, ParentExpandingRetriever
 from app.utils.context import customer_id_context
 
 # Environment variables
@@ -37,6 +39,17 @@ try:
     conn = Connection.connect(settings.db_uri, **connection_kwargs)
     checkpointer = PostgresSaver(conn)
     checkpointer.setup()
+    web_search_cache = WebSearchCache(
+        settings.db_uri,
+        ttl_seconds=settings.web_search_cache_ttl_seconds,
+        news_ttl_seconds=settings.web_search_news_ttl_seconds,
+        stale_seconds=settings.web_search_stale_seconds,
+        max_bytes=settings.web_search_cache_max_bytes,
+        memory_size=settings.web_search_memory_cache_size,
+        touch_interval_seconds=settings.web_search_touch_interval_seconds,
+        trim_interval_seconds=settings.web_search_trim_interval_seconds,
+    )
+    web_search_cache.setup()
     logger.info("Database setup completed successfully.")
 except Exception as e:
     logger.error(f"Database setup failed: {e}")
@@ -74,7 +87,7 @@ def init_workflow():
         # Retrieve the vector store containing pre-embedded documents.
         try:
             vector_store = PGVector(
-                embeddings=OpenAIEmbeddings(api_key=settings.openai_api_key),
+                embeddings=get_embeddings(),
                 collection_name=settings.vector_collection_name,
                 connection=settings.db_uri,
                 use_jsonb=True,
@@ -137,10 +150,24 @@ def init_workflow():
             logger.error(f"Error setting up cross-encoder reranker: {e}")
             raise
 
+        # Return the parent section in place of sibling chunks that were ranked together.
+        try:
+            parent_store = ParentDocumentStore(settings.db_uri, settings.vector_collection_name)
+            parent_store.setup()
+            parent_retriever = ParentExpandingRetriever(
+                base_retriever=final_retriever,
+                parent_store=parent_store,
+                min_children=settings.parent_expand_min_children,
+            )
+            logger.info("Parent document retriever set up successfully.")
+        except Exception as e:
+            logger.error(f"Error setting up parent document retriever: {e}")
+            raise
+
         # Create a tool for the research agent to retrieve information.
         try:
             retriever_tool = create_retriever_tool(
-                final_retriever,
+                parent_retriever,
                 "retrieve_about_us",
                 "Search and return information about the company",
             )
@@ -151,7 +178,7 @@ def init_workflow():
 
         # Set up a web search tool as an additional resource.
         try:
-            web_search = TavilySearch(max_results=3)
+            web_search = CachedTavilySearch(max_results=3, cache=web_search_cache)
             logger.info("Web search tool initialized successfully.")
         except Exception as e:
             logger.error(f"Error creating web search tool: {e}")
@@ -160,7 +187,7 @@ def init_workflow():
         # Initialize the research agent.
         try:
             research_agent = create_react_agent(
-                model=init_chat_model("gpt-4.1-nano-2025-04-14", temperature=0.3),
+                model=init_resilient_chat_model("gpt-4.1-nano-2025-04-14", temperature=0.3, label="research_agent"),
                 tools=[retriever_tool, web_search],
                 prompt=(
                     "You are a research agent.\n\n"
@@ -273,7 +300,7 @@ def init_workflow():
         # Initialize the appointment agent.
         try:
             appointment_agent = create_react_agent(
-                model=init_chat_model("gpt-4.1-nano-2025-04-14", temperature=0.1),
+                model=init_resilient_chat_model("gpt-4.1-nano-2025-04-14", temperature=0.1, label="appointment_agent"),
                 tools=[findCurrentTime, getSlots, bookSlot],
                 prompt = (
                     "- You are an appointment scheduling assistant and must handle ONLY appointment-related queries. Do not assist with any other type of query.\n"
@@ -299,26 +326,50 @@ def init_workflow():
 
         # Create a supervisor to manage both agents.
         try:
-            workflow = create_supervisor(
-                model=init_chat_model("gpt-4.1-mini-2025-04-14", temperature=0.7),
-                agents=[research_agent, appointment_agent],
-                prompt=(
-                    "- You are a supervisor having access to multiple agents.\n"
-                    "- You are good at understanding natural language.\n"
-                    "- You always look into history to extract past information and you can avoid unnecessary tool calls\n"
-                    "- You should carefully assess the user's intent and route the query to the appropriate agent.\n"
-                    "- If the user asks for general information, route to research_agent.\n"
-                    "- If the user asks to schedule an appointment, route to appointment_agent.\n"
-                    "- You should carefully assess the agent's response and route the query to the appropriate agent or respond to the user accordingly.\n"
-                    "- You should never ask the user to repeat the question, instead you should look into the history and extract the information from there.\n"
-                    "- You should never disclose your internal workings or the agent, tool names to the user.\n"
-                    "- You should never disclose any PII (Personally Identifiable Information) to the user.\n"
-                    "- Respond in a natural and conversational tone\n\n"
-                ),
-                add_handoff_back_messages=True,
-                output_mode="full_history",
-            )
-            logger.info("Supervisor initialized successfully.")
+            supervisor_mode = settings.supervisor_mode.lower()
+            if supervisor_mode not in ("sequential", "parallel"):
+                raise ValueError(f"Unsupported supervisor mode: {settings.supervisor_mode}")
+            supervisor_model = init_resilient_chat_model("gpt-4.1-mini-2025-04-14", temperature=0.7, label="supervisor")
+            if supervisor_mode == "parallel":
+                # Independent sub-tasks of one turn run on both agents concurrently.
+                workflow = create_parallel_supervisor(
+                    model=supervisor_model,
+                    agents=[research_agent, appointment_agent],
+                    prompt=(
+                        "- You are a supervisor having access to multiple agents.\n"
+                        "- You are good at understanding natural language.\n"
+                        "- You always look into history to extract past information.\n"
+                        "- You should never ask the user to repeat the question, instead you should look into the history and extract the information from there.\n"
+                        "- You should never disclose your internal workings or the agent, tool names to the user.\n"
+                        "- You should never disclose any PII (Personally Identifiable Information) to the user.\n"
+                        "- Respond in a natural and conversational tone\n\n"
+                    ),
+                    agent_descriptions={
+                        "research_agent": "answers general questions and questions about the company using its documents and web search.",
+                        "appointment_agent": "checks available slots and schedules appointments.",
+                    },
+                )
+            else:
+                workflow = create_supervisor(
+                    model=supervisor_model,
+                    agents=[research_agent, appointment_agent],
+                    prompt=(
+                        "- You are a supervisor having access to multiple agents.\n"
+                        "- You are good at understanding natural language.\n"
+                        "- You always look into history to extract past information and you can avoid unnecessary tool calls\n"
+                        "- You should carefully assess the user's intent and route the query to the appropriate agent.\n"
+                        "- If the user asks for general information, route to research_agent.\n"
+                        "- If the user asks to schedule an appointment, route to appointment_agent.\n"
+                        "- You should carefully assess the agent's response and route the query to the appropriate agent or respond to the user accordingly.\n"
+                        "- You should never ask the user to repeat the question, instead you should look into the history and extract the information from there.\n"
+                        "- You should never disclose your internal workings or the agent, tool names to the user.\n"
+                        "- You should never disclose any PII (Personally Identifiable Information) to the user.\n"
+                        "- Respond in a natural and conversational tone\n\n"
+                    ),
+                    add_handoff_back_messages=True,
+                    output_mode="full_history",
+                )
+            logger.info(f"Supervisor initialized successfully in {supervisor_mode} mode.")
         except Exception as e:
             logger.error(f"Error initializing supervisor: {e}")
             raise
@@ -0,0 +1,16 @@
+import os
+from huggingface_hub import snapshot_download
+
+local_dir = "app/models/bge-small-en-v1.5"
+repo_id = "BAAI/bge-small-en-v1.5"
+
+# Create the directory if it doesn't exist
+os.makedirs(local_dir, exist_ok=True)
+
+path = snapshot_download(
+    repo_id=repo_id,
+    local_dir=local_dir,
+    local_dir_use_symlinks=False  # ensures full files are stored, not symlinks
+)
+
+print(f"Model snapshot downloaded to: {path}")
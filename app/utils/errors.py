@@ -0,0 +1,13 @@
+import httpx
+import openai
+
+def is_transient_error(error: BaseException) -> bool:
+    """
+    Returns True for errors worth retrying or sending to a fallback:
+    timeouts, connection failures, rate limits (429) and server errors (5xx).
+    Other errors, such as 4xx responses, would fail the same way again.
+    """
+    if isinstance(error, (TimeoutError, ConnectionError, openai.APIConnectionError, httpx.TransportError)):
+        return True
+    status_code = getattr(error, "status_code", None)
+    return status_code == 429 or (isinstance(status_code, int) and status_code >= 500)
@@ -0,0 +1,127 @@
+"""
+Compares the legacy "##"-only header chunking with size-bounded parent/child
+chunking on a markdown document.
+
+For every query the candidates of each variant come from the same
+BM25 + vector similarity ensemble the research agent uses (k=5 each, weights
+0.3/0.7, embeddings from the configured EMBEDDING_BACKEND in an in-memory
+store). They are reranked with the cross-encoder, and the script reports the
+rerank latency and the number of tokens handed to the agent's LLM per
+retrieval. --bm25-only skips the embedding model and reranks BM25 candidates
+only; the report says which candidate source was used.
+
+Usage:
+    python benchmarks/chunking_benchmark.py --markdown doc.md --queries queries.txt
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+import tiktoken
+from langchain_community.cross_encoders import HuggingFaceCrossEncoder
+from langchain.retrievers import EnsembleRetriever
+from langchain_community.retrievers import BM25Retriever
+from langchain_core.vectorstores import InMemoryVectorStore
+from langchain_text_splitters import MarkdownHeaderTextSplitter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from app.services.chunking import expand_to_parents, split_markdown  # noqa: E402
+
+ENCODING = tiktoken.get_encoding("cl100k_base")
+# Reported only as a length bucket; bge-reranker-v2-m3 accepts up to 8192 tokens.
+LONG_CANDIDATE_TOKENS = 512
+
+def count_tokens(text):
+    return len(ENCODING.encode(text))
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def build_retriever(documents, k, embeddings):
+    bm25_retriever = BM25Retriever.from_documents(documents=documents, k=k)
+    if embeddings is None:
+        return bm25_retriever
+    vector_store = InMemoryVectorStore.from_documents(documents, embeddings)
+    similarity_retriever = vector_store.as_retriever(search_type="similarity", search_kwargs={"k": k})
+    return EnsembleRetriever(retrievers=[bm25_retriever, similarity_retriever], weights=[0.3, 0.7])
+
+def run_variant(name, documents, queries, reranker, embeddings, k, top_n, parents=None, min_children=2):
+    retriever = build_retriever(documents, k, embeddings)
+    latencies, candidate_counts, candidate_tokens, context_tokens, long_candidates = [], [], [], [], 0
+    for query in queries:
+        hits = retriever.invoke(query)
+        start = time.perf_counter()
+        scores = reranker.score([(query, doc.page_content) for doc in hits])
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        ranked = [doc for _, doc in sorted(zip(scores, hits), key=lambda pair: pair[0], reverse=True)][:top_n]
+        if parents is not None:
+            ranked = expand_to_parents(ranked, lambda ids: {i: parents[i] for i in ids if i in parents}, min_children)
+
+        candidate_counts.append(len(hits))
+        sizes = [count_tokens(doc.page_content) for doc in hits]
+        candidate_tokens.append(sum(sizes))
+        long_candidates += sum(1 for size in sizes if size > LONG_CANDIDATE_TOKENS)
+        # create_retriever_tool joins the documents with blank lines.
+        context_tokens.append(count_tokens("\n\n".join(doc.page_content for doc in ranked)))
+
+    print(f"\n{name}")
+    print(f"  indexed chunks:              {len(documents)}")
+    print(f"  candidates per query:        {statistics.mean(candidate_counts):.1f}")
+    print(f"  rerank latency mean / p95:   {statistics.mean(latencies):.1f} ms / {percentile(latencies, 95):.1f} ms")
+    print(f"  reranked tokens per query:   {statistics.mean(candidate_tokens):.0f}")
+    print(f"  long candidates (>{LONG_CANDIDATE_TOKENS} tok): {long_candidates}")
+    print(f"  context tokens per turn:     {statistics.mean(context_tokens):.0f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--markdown", required=True, help="Markdown file, e.g. the output of process_document().")
+    parser.add_argument("--queries", required=True, help="Text file with one query per line.")
+    parser.add_argument("--reranker-dir", default="app/models/bge-reranker-v2-m3")
+    parser.add_argument("--k", type=int, default=5, help="Candidates per retriever, as in init_workflow.")
+    parser.add_argument("--bm25-only", action="store_true", help="Rerank BM25 candidates only, without embeddings.")
+    parser.add_argument("--top-n", type=int, default=5)
+    parser.add_argument("--parent-tokens", type=int, default=1024)
+    parser.add_argument("--child-tokens", type=int, default=256)
+    parser.add_argument("--child-overlap", type=int, default=32)
+    parser.add_argument("--min-children", type=int, default=2)
+    args = parser.parse_args()
+
+    with open(args.markdown, encoding="utf-8") as f:
+        markdown_content = f.read()
+    with open(args.queries, encoding="utf-8") as f:
+        queries = [line.strip() for line in f if line.strip()]
+
+    embeddings = None
+    if not args.bm25_only:
+        # Imported here because it reads the application settings from .env.
+        from app.services.embeddings import get_embeddings
+        embeddings = get_embeddings()
+    print(f"Candidate source: {'BM25 only' if embeddings is None else 'BM25 + vector similarity ensemble'}")
+
+    reranker = HuggingFaceCrossEncoder(model_name=args.reranker_dir)
+    # Warm up so model loading is not counted against the first variant.
+    reranker.score([("warm up", "warm up")])
+
+    legacy = MarkdownHeaderTextSplitter([("##", "Header 1")]).split_text(markdown_content)
+    run_variant("Before: '##' header splitting", legacy, queries, reranker, embeddings, args.k, args.top_n)
+
+    parents, children = split_markdown(
+        markdown_content,
+        [("#", "Header 1"), ("##", "Header 2"), ("###", "Header 3")],
+        parent_chunk_tokens=args.parent_tokens,
+        child_chunk_tokens=args.child_tokens,
+        child_chunk_overlap=args.child_overlap,
+    )
+    run_variant(
+        "After: token-bounded children with parent expansion",
+        children, queries, reranker, embeddings, args.k, args.top_n,
+        parents={parent.id: parent for parent in parents},
+        min_children=args.min_children,
+    )
+
+if __name__ == "__main__":
+    main()
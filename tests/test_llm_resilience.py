@@ -0,0 +1,88 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, List, Optional
+
+# app.config requires these settings at import time.
+for name in ("TAVILY_API_KEY", "LANGSMITH_API_KEY", "OPENAI_API_KEY", "DB_URI", "VECTOR_COLLECTION_NAME"):
+    os.environ.setdefault(name, "test")
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from langgraph.graph import START, MessagesState, StateGraph
+from langgraph_supervisor import create_supervisor
+from pydantic import Field
+from app.services import llm_resilience
+from app.services.llm_resilience import ResilientChatModel
+
+class RecordingChatModel(BaseChatModel):
+    """Answers without tool calls and records the kwargs of every call."""
+
+    calls: List[dict] = Field(default_factory=list)
+    error: Optional[Exception] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "recording"
+
+    def bind_tools(self, tools, *, tool_choice=None, parallel_tool_calls=None, **kwargs):
+        if tool_choice is not None:
+            kwargs["tool_choice"] = tool_choice
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _generate(self, messages: List[BaseMessage], stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self.calls.append(kwargs)
+        if self.error is not None:
+            raise self.error
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content="done"))])
+
+def make_agent(name):
+    builder = StateGraph(MessagesState)
+    builder.add_node("respond", lambda state: {"messages": [AIMessage(content=name)]})
+    builder.add_edge(START, "respond")
+    return builder.compile(name=name)
+
+def run_supervisor(model):
+    workflow = create_supervisor(
+        model=model,
+        agents=[make_agent("research_agent"), make_agent("appointment_agent")],
+        prompt="Route the query.",
+    )
+    workflow.compile().invoke({"messages": [{"role": "user", "content": "hi"}]})
+
+def tool_names(call):
+    return {tool["function"]["name"] for tool in call["tools"]}
+
+def test_supervisor_keeps_parallel_tool_calls_disabled():
+    primary = RecordingChatModel()
+    run_supervisor(ResilientChatModel(primary=primary, hedging_enabled=False))
+
+    call = primary.calls[-1]
+    assert call["parallel_tool_calls"] is False
+    assert tool_names(call) == {"transfer_to_research_agent", "transfer_to_appointment_agent"}
+
+def test_fallback_keeps_parallel_tool_calls_disabled():
+    primary = RecordingChatModel(error=ConnectionError("reset"))
+    fallback = RecordingChatModel()
+    run_supervisor(ResilientChatModel(primary=primary, fallbacks=[fallback], hedging_enabled=False, max_retries=0))
+
+    assert fallback.calls[-1]["parallel_tool_calls"] is False
+    assert tool_names(fallback.calls[-1]) == tool_names(primary.calls[-1])
+
+def test_hedge_skipped_in_busy_pool_does_not_win(monkeypatch):
+    # With one worker the hedge only starts after the original has answered.
+    monkeypatch.setattr(llm_resilience, "_executor", ThreadPoolExecutor(max_workers=1))
+
+    def answer(messages, **kwargs):
+        time.sleep(0.02)
+        return AIMessage(content="ok")
+
+    model = ResilientChatModel(primary=RunnableLambda(answer), label="busy_pool", hedge_delay_seconds=0.005)
+    for _ in range(20):
+        assert model.invoke("hi").content == "ok"
+    assert llm_resilience.LLM_HEDGES_WON.labels("busy_pool")._value.get() == 0